@@ -0,0 +1,61 @@
+# Replays a print's serial log through an OctoPrint-like receive loop and measures what the AutoBim
+# gcode.received hook costs while printing.
+#
+# Run from the repository root, optionally passing a serial.log recorded by OctoPrint:
+#     python -m benchmarks.bench_print_log [serial.log]
+from __future__ import print_function
+
+import sys
+import timeit
+
+from benchmarks.bench_process_gcode import create_plugin
+from benchmarks.serial_traffic import print_traffic
+from tests.mocks import MockComm
+
+
+LINES = 500000
+
+
+def load_log(path):
+	lines = []
+	with open(path) as f:
+		for line in f:
+			# OctoPrint's serial.log prefixes received lines with "Recv: "
+			idx = line.find("Recv: ")
+			if idx >= 0:
+				lines.append(line[idx + len("Recv: "):].rstrip("\r\n"))
+	return lines
+
+
+def replay(comm, lines):
+	start = timeit.default_timer()
+	for line in lines:
+		comm.receive(line)
+	return timeit.default_timer() - start
+
+
+def main():
+	lines = load_log(sys.argv[1]) if len(sys.argv) > 1 else print_traffic(LINES)
+
+	plugin = create_plugin()
+	comm = MockComm()
+	plugin._printer._comm = comm
+
+	baseline = replay(comm, lines)
+
+	# Previous behaviour: hook registered for OctoPrint's whole lifetime
+	comm._received_message_hooks["autobim"] = plugin.process_gcode
+	static = replay(comm, lines)
+	del comm._received_message_hooks["autobim"]
+
+	# Current behaviour: outside of a session the hook is not attached at all
+	dynamic = replay(comm, lines)
+
+	print("Replayed %d lines" % len(lines))
+	for name, elapsed in [("no hook", baseline), ("static hook", static), ("dynamic hook", dynamic)]:
+		overhead = (elapsed - baseline) / len(lines) * 1e9
+		print("%-15s %8.3f s  %+8.1f ns/line" % (name, elapsed, overhead))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,72 @@
+# Measures the overhead of AutobimPlugin.process_gcode per received line.
+#
+# Run from the repository root:
+#     python -m benchmarks.bench_process_gcode
+from __future__ import print_function
+
+import logging
+import timeit
+
+from benchmarks.serial_traffic import print_traffic
+from octoprint_autobim.autobim import AutobimPlugin
+from tests.mocks import MockPrinter, MockSettings, MockPluginManager
+
+
+LINES = 200000
+
+
+def create_plugin():
+	plugin = AutobimPlugin()
+	plugin._identifier = "autobim"
+	plugin._logger = logging.getLogger("benchmark")
+	plugin._plugin_manager = MockPluginManager()
+	plugin._printer = MockPrinter()
+	plugin._settings = MockSettings(plugin.get_settings_defaults())
+	plugin.on_after_startup()
+	return plugin
+
+
+def legacy_process_gcode(plugin):
+	# The pre-dispatcher implementation: every handler sees every line
+	def process_gcode(_, line, *args, **kwargs):
+		try:
+			for handler in plugin.handlers:
+				handler.handle(line)
+		except Exception as e:
+			plugin._logger.error("Error in process_gcode: %s" % str(e))
+		return line
+	return process_gcode
+
+
+def measure(hook, lines):
+	start = timeit.default_timer()
+	for line in lines:
+		hook(None, line)
+	return len(lines) / (timeit.default_timer() - start)
+
+
+def report(name, hook, lines):
+	print("%-30s %12.0f lines/s" % (name, measure(hook, lines)))
+
+
+def main():
+	lines = print_traffic(LINES)
+	plugin = create_plugin()
+
+	print("Idle (no command in flight)")
+	report("  legacy", legacy_process_gcode(plugin), lines)
+	report("  dispatcher", plugin.process_gcode, lines)
+
+	# Arm the G30 handler without ever satisfying it
+	plugin.g30._update_pattern_if_changed()
+	plugin.g30._set_running()
+
+	print("G30 in flight")
+	report("  legacy", legacy_process_gcode(plugin), lines)
+	report("  dispatcher", plugin.process_gcode, lines)
+
+	plugin.g30.abort()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,31 @@
+import random
+
+
+PRINT_LINES = [
+	"ok",
+	"ok",
+	"ok",
+	"ok T:210.12 /210.00 B:60.03 /60.00 @:127 B@:0",
+	"T:210.12 /210.00 B:60.03 /60.00 @:127 B@:0",
+	"echo:busy: processing",
+	"X:112.40 Y:95.20 Z:0.28 E:1532.11 Count X:8992 Y:7616 Z:112",
+	"ok N1532 P15 B3",
+]
+
+KLIPPER_LINES = [
+	"ok",
+	"ok",
+	"B:60.0 /60.0 T0:210.0 /210.0",
+	"// Klipper state: Ready",
+	"echo:busy: processing",
+]
+
+
+def print_traffic(count, seed=42):
+	rng = random.Random(seed)
+	return [rng.choice(PRINT_LINES) for _ in range(count)]
+
+
+def klipper_traffic(count, seed=42):
+	rng = random.Random(seed)
+	return [rng.choice(KLIPPER_LINES) for _ in range(count)]
@@ -12,6 +12,5 @@ def __plugin_load__():
 	global __plugin_hooks__
 	__plugin_hooks__ = {
 		"octoprint.plugin.softwareupdate.check_config": __plugin_implementation__.get_update_information,
-		"octoprint.comm.protocol.gcode.received": __plugin_implementation__.process_gcode,
 		"octoprint.comm.protocol.atcommand.queuing": __plugin_implementation__.atcommand_handler,
 	}
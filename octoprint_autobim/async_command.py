@@ -36,13 +36,26 @@ class AsyncCommand(object):
 	def __init__(self):
 		self.__running = False
 		self.__result = queue.Queue(maxsize=1)
+		self.__listener = None
 
 	def _handle_internal(self, line):
 		raise NotImplementedError()
 
+	def get_prefixes(self):
+		# None means every received line is of interest
+		return None
+
+	def set_listener(self, listener):
+		self.__listener = listener
+
+	def _notify(self):
+		if self.__listener:
+			self.__listener()
+
 	def _set_running(self):
 		self._flush()
 		self.__running = True
+		self._notify()
 
 	# Do not touch the rest of the implementation
 
@@ -53,11 +66,13 @@ class AsyncCommand(object):
 
 	def _register_result(self, result):
 		self.__running = False
+		self._notify()
 		self._flush()
 		self.__result.put(result, False)
 
 	def abort(self):
 		self.__running = False
+		self._notify()
 		self._flush()
 		self.__result.put(Result.abort(), False)
 
@@ -68,6 +83,7 @@ class AsyncCommand(object):
 			return Result.no_result()
 		finally:
 			self.__running = False
+			self._notify()
 
 	def _flush(self):
 		try:
@@ -9,8 +9,12 @@ from flask import jsonify
 
 from octoprint.access.permissions import Permissions
 
+from octoprint_autobim.dispatcher import LineDispatcher
 from octoprint_autobim.g30 import G30Handler
 from octoprint_autobim.m503 import M503Handler
+from octoprint_autobim.plane import fit_plane
+from octoprint_autobim.received_hook import ReceivedHook
+from octoprint_autobim.route import optimize_route
 from octoprint_autobim.utils import filter_commands
 
 
@@ -35,7 +39,10 @@ class AutobimPlugin(
 		self.g30_tester = None
 		self.m503 = None
 		self.handlers = []
+		self.dispatcher = LineDispatcher()
+		self.received_hook = None
 		self.running = False
+		self._resume = threading.Event()
 
 	##~~ StartupPlugin mixin
 
@@ -43,12 +50,15 @@ class AutobimPlugin(
 		self.g30 = G30Handler(self._printer, self._settings, self._logger)
 		self.g30_tester = G30Handler(self._printer, self._settings, self._logger, False)
 		self.m503 = M503Handler(self._printer)
+		self.received_hook = ReceivedHook(self._printer, self._identifier, self.process_gcode, self._logger)
 
 		self.handlers = [
 			self.g30,
 			self.g30_tester,
 			self.m503,
 		]
+		for handler in self.handlers:
+			self.dispatcher.register(handler)
 
 		self._logger.info("AutoBim *ring-ring*")
 
@@ -103,6 +113,7 @@ class AutobimPlugin(
 			home=[],
 			test_corner=[],
 			test_all_corners=[],
+			resume=[],
 		)
 
 	def _has_control_permission(self):
@@ -120,6 +131,9 @@ class AutobimPlugin(
 			thread.start()
 		elif command == "abort":
 			self._abort_now("Aborted by user")
+		elif command == "resume":
+			self._resume.set()
+			return jsonify({}), 200
 		elif command == "status":
 			return jsonify({"running": self.running}), 200
 		elif command == "home":
@@ -134,7 +148,8 @@ class AutobimPlugin(
 
 	def on_test_point(self, point):
 		self._logger.info("Got X%s, Y%s" % point)
-		result = self.g30_tester.do(point, 30)
+		with self.received_hook:
+			result = self.g30_tester.do(point, 30)
 		if result.has_value():
 			self._plugin_manager.send_plugin_message(
 				self._identifier,
@@ -148,6 +163,8 @@ class AutobimPlugin(
 	def on_test_points(self, point_list):
 		results = []
 		self._logger.info("PointList: %s" % str(point_list))
+		if self._settings.get_boolean(["optimize_route"]):
+			point_list = optimize_route(point_list, self._get_home_position(), lambda p: (p['x'], p['y']))
 		for point in point_list:
 			results.append({
 				'point': point,
@@ -173,17 +190,25 @@ class AutobimPlugin(
 			next_point_delay=0.0,
 			next_probe_delay=0.0,
 			first_corner_is_reference=False,
+			optimize_route=False,
+			home_position=dict(x="0", y="0"),
+			tramming_mode="iterative",
+			screw_pitch=0.5,
+			screw_positions=[],
 			g30_regex="",
 			before_gcode=None,
 			after_gcode=None,
 		)
 
-	##~~ Gcode received hook
+	##~~ Gcode received hook - only attached while AutoBim waits for responses, see ReceivedHook
 
 	def process_gcode(self, _, line, *args, **kwargs):
+		# Fast path: nothing is waiting for a response
+		if not self.dispatcher.armed:
+			return line
+
 		try:
-			for handler in self.handlers:
-				handler.handle(line)
+			self.dispatcher.dispatch(line)
 		except Exception as e:
 			self._logger.error("Error in process_gcode: %s" % str(e))
 
@@ -206,7 +231,8 @@ class AutobimPlugin(
 			raise AutoBimError("Can't start AutoBim - printer is printing!")
 		if self._settings.get_boolean(["has_ubl"]) is None:
 			self._logger.info("Unknown whether UBL or not - checking")
-			self._handle_m503_result(self.m503.do())
+			with self.received_hook:
+				self._handle_m503_result(self.m503.do())
 
 	def _handle_m503_result(self, result):
 		if result.abort:
@@ -237,6 +263,10 @@ class AutobimPlugin(
 
 		self.running = True
 
+		with self.received_hook:
+			self._autobim()
+
+	def _autobim(self):
 		self.check_state()
 
 		self._plugin_manager.send_plugin_message(self._identifier, dict(type="started"))
@@ -254,6 +284,26 @@ class AutobimPlugin(
 		if before_gcode:
 			self._printer.commands(filter_commands(before_gcode))
 
+		probe_points = self._get_ordered_probe_points()
+
+		if self._settings.get(["tramming_mode"]) == "predictive":
+			completed = self._tram_predictive(probe_points)
+		else:
+			completed = self._tram_iterative(probe_points)
+		if not completed:
+			return
+
+		self._printer.commands("M117 done")
+		self.running = False
+
+		# Custom GCode
+		after_gcode = self._settings.get(["after_gcode"])
+		if after_gcode:
+			self._printer.commands(filter_commands(after_gcode))
+
+		self._plugin_manager.send_plugin_message(self._identifier, dict(type="completed"))
+
+	def _tram_iterative(self, probe_points):
 		threshold = self._settings.get_float(["threshold"])
 		multipass = self._settings.get_boolean(["multipass"])
 		next_point_delay = self._settings.get_float(["next_point_delay"])
@@ -268,25 +318,25 @@ class AutobimPlugin(
 			self._logger.info("Treating first corner as reference")
 			self._printer.commands("M117 Getting reference...")
 
-			result = self._probe_point(self.get_probe_points()[0])
+			result = self._probe_point(probe_points[0])
 			if not result.has_value():
-				return
+				return False
 
 			reference = result.value
 			corner_index = 1
 			correct_corners = 1
 			self._printer.commands("M117 wait...")
 
-		while correct_corners < len(self.get_probe_points()) and self.running:
-			corner = self.get_probe_points()[corner_index]
-			corner_index = (corner_index + 1) % len(self.get_probe_points())
+		while correct_corners < len(probe_points) and self.running:
+			corner = probe_points[corner_index]
+			corner_index = (corner_index + 1) % len(probe_points)
 
 			delta = 2 * threshold
 			while abs(delta) >= threshold and self.running:
 
 				z_current = self._probe_point(corner)
 				if not z_current.has_value():
-					return
+					return False
 
 				delta = z_current.value - reference
 				if abs(delta) >= threshold:
@@ -302,35 +352,108 @@ class AutobimPlugin(
 			if next_point_delay:
 				time.sleep(next_point_delay)
 
-		self._printer.commands("M117 done")
-		self.running = False
-
-		# Custom GCode
-		after_gcode = self._settings.get(["after_gcode"])
-		if after_gcode:
-			self._printer.commands(filter_commands(after_gcode))
+		return True
 
-		self._plugin_manager.send_plugin_message(self._identifier, dict(type="completed"))
+	def _tram_predictive(self, probe_points):
+		threshold = self._settings.get_float(["threshold"])
+		first_is_reference = self._settings.get_boolean(["first_corner_is_reference"])
+
+		while self.running:
+			samples = []
+			for point in probe_points:
+				result = self._probe_point(point)
+				if not result.has_value():
+					return False
+				samples.append((point[0], point[1], result.value))
+
+			# Default reference is Z=0
+			reference = samples[0][2] if first_is_reference else 0
+			if all(abs(z - reference) < threshold for _, _, z in samples):
+				return True
+
+			corrections = self._predict_corrections(samples, reference, threshold)
+			self._resume.clear()
+			self._printer.commands("M117 Adjust %d screws, see OctoPrint" % len(corrections))
+			self._plugin_manager.send_plugin_message(self._identifier, dict(type="corrections", corrections=corrections))
+			if not self._wait_for_resume():
+				return False
+			self._printer.commands("M117 verifying...")
+
+		return False
+
+	def _predict_corrections(self, samples, reference, threshold):
+		screws = [(s['x'], s['y']) for s in self._settings.get(["screw_positions"]) or []]
+		if not screws:
+			screws = [(x, y) for x, y, _ in samples]
+		pitch = self._settings.get_float(["screw_pitch"])
+
+		plane = None
+		if len(samples) >= 3:
+			try:
+				plane = fit_plane(samples)
+			except ValueError as e:
+				self._logger.warning("Cannot fit plane, using measurements only: %s" % str(e))
+
+		measured = dict(((float(x), float(y)), z) for x, y, z in samples)
+		corrections = []
+		for x, y in screws:
+			# A bed held by four or more screws is not necessarily planar, so where a screw sits right at a
+			# probed point the measurement wins over the fit
+			z = measured.get((float(x), float(y)))
+			if z is None:
+				z = plane.z_at(x, y) if plane else reference
+			delta = z - reference
+			if abs(delta) < threshold:
+				continue
+			corrections.append(dict(
+				x=x,
+				y=y,
+				mm=round(delta, 3),
+				turns=round(abs(delta) / pitch, 2),
+				direction=self._get_direction(delta),
+			))
+		return corrections
+
+	def _wait_for_resume(self):
+		while self.running:
+			if self._resume.wait(0.5):
+				return self.running
+		return False
 
 	def get_probe_points(self):
 		points = self._settings.get(['probe_points'])
 		return [(p['x'], p['y']) for p in points]
 
+	def _get_ordered_probe_points(self):
+		points = self.get_probe_points()
+		if not self._settings.get_boolean(["optimize_route"]):
+			return points
+		if self._settings.get_boolean(["first_corner_is_reference"]):
+			# The reference has to stay first, so start the route from there
+			return points[:1] + optimize_route(points[1:], points[0])
+		return optimize_route(points, self._get_home_position())
+
+	def _get_home_position(self):
+		home = self._settings.get(["home_position"])
+		return home['x'], home['y']
+
 	def _get_message(self, diff=None):
 		if not diff:
 			return "ok. moving to next"
 
+		return "%.2f %s (adjust)" % (diff, self._get_direction(diff))
+
+	def _get_direction(self, diff):
 		invert = self._settings.get_boolean(['invert'])
 		if invert ^ (diff < 0):
-			msg = "%.2f " % diff + "<<<"
-		else:
-			msg = "%.2f " % diff + ">>>"
-		return msg + " (adjust)"
+			return "<<<"
+		return ">>>"
 
 	def _abort_now(self, msg):
 		self._logger.error(msg)
 		self._printer.commands("M117 %s" % msg)
 		self.running = False
+		self._resume.set()
 		for handler in self.handlers:
 			handler.abort()
 
@@ -0,0 +1,50 @@
+import threading
+
+
+class LineDispatcher(object):
+	def __init__(self):
+		# Read by the comm thread on every received line - keep it a plain attribute
+		self.armed = False
+		self._handlers = []
+		self._table = {}
+		self._catch_all = ()
+		self._lock = threading.Lock()
+
+	def register(self, handler):
+		with self._lock:
+			self._handlers.append(handler)
+		handler.set_listener(self.rebuild)
+		self.rebuild()
+
+	def rebuild(self):
+		table = {}
+		catch_all = []
+		with self._lock:
+			for handler in self._handlers:
+				if not handler.is_running():
+					continue
+				prefixes = handler.get_prefixes()
+				if prefixes is None:
+					catch_all.append(handler)
+					continue
+				by_first_char = {}
+				for prefix in prefixes:
+					by_first_char.setdefault(prefix[0], []).append(prefix)
+				for first_char, grouped in by_first_char.items():
+					table.setdefault(first_char, []).append((tuple(grouped), handler))
+			self._table = table
+			self._catch_all = tuple(catch_all)
+			self.armed = bool(table or catch_all)
+
+	def dispatch(self, line):
+		if not self.armed or not line:
+			return
+
+		table = self._table
+		catch_all = self._catch_all
+
+		for prefixes, handler in table.get(line[0], ()):
+			if line.startswith(prefixes):
+				handler.handle(line)
+		for handler in catch_all:
+			handler.handle(line)
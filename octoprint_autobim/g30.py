@@ -7,6 +7,9 @@ from octoprint_autobim.utils import filter_commands
 MARLIN_PATTERN = re.compile(r"^Bed X: ?-?\d+\.\d+ Y: ?-?\d+\.\d+ Z: ?(-?\d+\.\d+)$")
 KLIPPER_PATTERN = re.compile(r"^// Result is z=(-?\d+\.\d+)$")
 
+MARLIN_PREFIXES = ("Bed X:", "Error:", "ok")
+KLIPPER_PREFIXES = ("// Result is", "Error:", "ok")
+
 
 class G30Handler(AsyncCommand):
 	def __init__(self, printer, settings, logger, ignore_ok=True):
@@ -16,19 +19,27 @@ class G30Handler(AsyncCommand):
 		self._settings = settings
 		self._ok_is_error = not ignore_ok
 		self.pattern = None
+		self.prefixes = None
+
+	def get_prefixes(self):
+		return self.prefixes
 
 	def _update_pattern_if_changed(self):
 		custom_pattern = self._settings.get(["g30_regex"])
 		if custom_pattern:
 			if not self.pattern or self.pattern.pattern != custom_pattern:
 				self.pattern = re.compile(custom_pattern)
+			# A custom pattern may match anything
+			self.prefixes = None
 		else:
 			firmware_name = self._printer.firmware_info['name']
 			if "klipper" in firmware_name.lower():
 				self.pattern = KLIPPER_PATTERN
+				self.prefixes = KLIPPER_PREFIXES
 				self._logger.info("Updated G30 pattern to Klipper as the firmware name is %s", firmware_name)
 			else:
 				self.pattern = MARLIN_PATTERN
+				self.prefixes = MARLIN_PREFIXES
 				self._logger.info("Updated G30 pattern to Marlin as the firmware name is %s", firmware_name)
 
 	def do(self, point, timeout=180):
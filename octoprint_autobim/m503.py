@@ -1,11 +1,17 @@
 from octoprint_autobim.async_command import AsyncCommand, Result
 
 
+PREFIXES = ("ok", "Unknown command", "Unified Bed Leveling", "echo:", "//")
+
+
 class M503Handler(AsyncCommand):
 	def __init__(self, printer):
 		super(M503Handler, self).__init__()
 		self._printer = printer
 
+	def get_prefixes(self):
+		return PREFIXES
+
 	def do(self, timeout=5):
 		self._start()
 		return self._get(timeout)
@@ -0,0 +1,54 @@
+class Plane(object):
+	# z = a * x + b * y + c
+
+	def __init__(self, a, b, c):
+		self.a = a
+		self.b = b
+		self.c = c
+
+	def z_at(self, x, y):
+		return self.a * float(x) + self.b * float(y) + self.c
+
+
+def _determinant(m):
+	return m[0][0] * (m[1][1] * m[2][2] - m[1][2] * m[2][1]) \
+		- m[0][1] * (m[1][0] * m[2][2] - m[1][2] * m[2][0]) \
+		+ m[0][2] * (m[1][0] * m[2][1] - m[1][1] * m[2][0])
+
+
+def fit_plane(samples):
+	# Least squares fit of (x, y, z) samples, solved via the normal equations and Cramer's rule
+	if len(samples) < 3:
+		raise ValueError("Need at least 3 points to fit a plane, got %d" % len(samples))
+
+	sxx = sxy = syy = sx = sy = sxz = syz = sz = 0.0
+	for x, y, z in samples:
+		x, y, z = float(x), float(y), float(z)
+		sxx += x * x
+		sxy += x * y
+		syy += y * y
+		sx += x
+		sy += y
+		sxz += x * z
+		syz += y * z
+		sz += z
+	n = float(len(samples))
+
+	matrix = [
+		[sxx, sxy, sx],
+		[sxy, syy, sy],
+		[sx, sy, n],
+	]
+	rhs = [sxz, syz, sz]
+
+	det = _determinant(matrix)
+	if abs(det) < 1e-9:
+		raise ValueError("Points are collinear, cannot fit a plane")
+
+	coefficients = []
+	for column in range(3):
+		replaced = [row[:] for row in matrix]
+		for row in range(3):
+			replaced[row][column] = rhs[row]
+		coefficients.append(_determinant(replaced) / det)
+	return Plane(*coefficients)
@@ -0,0 +1,60 @@
+import threading
+
+
+class ReceivedHook(object):
+	# OctoPrint only reads __plugin_hooks__ once, so to keep the comm thread free of AutoBim calls while
+	# nothing is going on the hook is put into (and taken out of) the comm layer's hook table directly.
+
+	def __init__(self, printer, identifier, hook, logger):
+		self._printer = printer
+		self._identifier = identifier
+		self._hook = hook
+		self._logger = logger
+		self._lock = threading.Lock()
+		self._sessions = 0
+		self._comm = None
+
+	def __enter__(self):
+		self.attach()
+		return self
+
+	def __exit__(self, *args):
+		self.detach()
+
+	def is_attached(self):
+		return self._comm is not None
+
+	def attach(self):
+		with self._lock:
+			self._sessions += 1
+			if self._sessions == 1:
+				self._comm = self._install()
+
+	def detach(self):
+		with self._lock:
+			if not self._sessions:
+				return
+			self._sessions -= 1
+			if not self._sessions and self._comm is not None:
+				self._uninstall(self._comm)
+				self._comm = None
+
+	def _install(self):
+		comm = getattr(self._printer, "_comm", None)
+		hooks = getattr(comm, "_received_message_hooks", None)
+		if hooks is None:
+			self._logger.warning("Cannot attach gcode.received hook - printer not connected?")
+			return None
+
+		# Copy on write: the comm thread may be iterating over the current table right now
+		updated = hooks.copy()
+		updated[self._identifier] = self._hook
+		comm._received_message_hooks = updated
+		self._logger.debug("Attached gcode.received hook")
+		return comm
+
+	def _uninstall(self, comm):
+		updated = comm._received_message_hooks.copy()
+		updated.pop(self._identifier, None)
+		comm._received_message_hooks = updated
+		self._logger.debug("Detached gcode.received hook")
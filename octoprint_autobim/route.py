@@ -0,0 +1,55 @@
+import math
+
+
+def _distance(a, b):
+	if a is None or b is None:
+		return 0.0
+	return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+def _nearest_neighbour(start, coords):
+	remaining = list(range(len(coords)))
+	order = []
+	current = start
+	while remaining:
+		nearest = min(remaining, key=lambda i: _distance(current, coords[i]))
+		remaining.remove(nearest)
+		order.append(nearest)
+		current = coords[nearest]
+	return order
+
+
+def _two_opt(start, coords, order):
+	# Open path with a fixed start, i.e. the path does not return to where it started
+	path = [start] + [coords[i] for i in order]
+	order = list(order)
+	improved = True
+	while improved:
+		improved = False
+		for i in range(1, len(path) - 1):
+			for k in range(i + 1, len(path)):
+				after = path[k + 1] if k + 1 < len(path) else None
+				delta = _distance(path[i - 1], path[k]) + _distance(path[i], after) \
+					- _distance(path[i - 1], path[i]) - _distance(path[k], after)
+				if delta < -1e-9:
+					path[i:k + 1] = reversed(path[i:k + 1])
+					order[i - 1:k] = reversed(order[i - 1:k])
+					improved = True
+	return order
+
+
+def route_length(points, start=(0, 0), coordinates=lambda p: p):
+	length = 0.0
+	current = (float(start[0]), float(start[1]))
+	for point in points:
+		x, y = coordinates(point)
+		length += _distance(current, (float(x), float(y)))
+		current = (float(x), float(y))
+	return length
+
+
+def optimize_route(points, start=(0, 0), coordinates=lambda p: p):
+	coords = [(float(x), float(y)) for x, y in (coordinates(p) for p in points)]
+	start = (float(start[0]), float(start[1]))
+	order = _two_opt(start, coords, _nearest_neighbour(start, coords))
+	return [points[i] for i in order]
@@ -5,7 +5,7 @@ from time import sleep
 import pytest
 
 from octoprint_autobim.autobim import AutobimPlugin
-from tests.mocks import MockPrinter, MockSettings, MockPluginManager
+from tests.mocks import MockComm, MockPrinter, MockSettings, MockPluginManager
 
 
 class ThreadWithValue(threading.Thread):
@@ -416,3 +416,146 @@ def test_delay_between_porbes(plugin):
 	plugin._abort_now("")
 	assert not plugin.running
 	thread.join(1)
+
+
+def test_received_hook_only_attached_while_testing(plugin):
+	plugin._printer._comm = MockComm()
+	comm = plugin._printer._comm
+	assert "AutoBim" not in comm._received_message_hooks
+
+	thread = ThreadWithValue(plugin.on_test_point, ((1, 2),))
+	thread.start()
+	sleep(0.01)
+
+	assert "AutoBim" in comm._received_message_hooks
+	comm.receive("Bed X: 1.0 Y: 2.0 Z: 3.0")
+	sleep(0.01)
+
+	assert thread.get()
+	assert "AutoBim" not in comm._received_message_hooks
+
+
+def test_optimize_route(plugin):
+	plugin._settings.set(["optimize_route"], True)
+	plugin._settings.set(["multipass"], False)
+	plugin._settings.set(["probe_points"], [
+		dict(x="200", y="200"),
+		dict(x="30", y="30"),
+		dict(x="200", y="30"),
+		dict(x="30", y="200"),
+	])
+
+	thread = threading.Thread(target=plugin.autobim)
+	thread.start()
+	sleep(0.01)
+
+	probed = []
+	while plugin.running:
+		probed.append(plugin._printer.sent_commands[-1])
+		plugin.process_gcode(None, "Bed X: 1.0 Y: 2.0 Z: 0.0")
+		plugin.process_gcode(None, "ok")
+		sleep(0.01)
+
+	assert probed == ['G30 X30 Y30', 'G30 X200 Y30', 'G30 X200 Y200', 'G30 X30 Y200']
+	thread.join(0)
+
+
+def test_optimize_route_keeps_reference_first(plugin):
+	plugin._settings.set(["optimize_route"], True)
+	plugin._settings.set(["first_corner_is_reference"], True)
+	plugin._settings.set(["probe_points"], [
+		dict(x="200", y="200"),
+		dict(x="30", y="30"),
+		dict(x="200", y="30"),
+	])
+
+	assert plugin._get_ordered_probe_points() == [("200", "200"), ("200", "30"), ("30", "30")]
+
+
+def test_test_points_optimized(plugin):
+	plugin._settings.set(["optimize_route"], True)
+
+	thread = ThreadWithValue(plugin.on_test_points, ([{'x': 200, 'y': 200}, {'x': 1, 'y': 2}],))
+	thread.start()
+	sleep(0.01)
+
+	plugin.process_gcode(None, "Bed X: 1.0 Y: 2.0 Z: 3.0")
+	sleep(0.01)
+	plugin.process_gcode(None, "Bed X: 200.0 Y: 200.0 Z: 3.0")
+	sleep(0.01)
+
+	assert plugin._printer.sent_commands == ['G30 X1 Y2', 'G30 X200 Y200']
+	assert thread.get() == {'results': [
+		{'point': {'x': 1, 'y': 2}, 'result': True},
+		{'point': {'x': 200, 'y': 200}, 'result': True},
+	]}
+
+
+def test_predictive(plugin):
+	plugin._settings.set(["tramming_mode"], "predictive")
+	plugin._settings.set(["screw_pitch"], 0.5)
+
+	thread = threading.Thread(target=plugin.autobim)
+	thread.start()
+	sleep(0.01)
+
+	measurements = [0.25, 0.0, -0.1, 0.005]
+	for point, z in zip(plugin.get_probe_points(), measurements):
+		assert plugin._printer.sent_commands[-1] == "G30 X%s Y%s" % point
+		plugin.process_gcode(None, "Bed X: %s.0 Y: %s.0 Z: %s" % (point[0], point[1], z))
+		sleep(0.01)
+
+	assert plugin._printer.sent_commands[-1] == "M117 Adjust 2 screws, see OctoPrint"
+	assert plugin._plugin_manager.sent_messages[-1] == dict(type="corrections", corrections=[
+		dict(x="30", y="30", mm=0.25, turns=0.5, direction=">>>"),
+		dict(x="200", y="200", mm=-0.1, turns=0.2, direction="<<<"),
+	])
+
+	# Waits for the user
+	sleep(0.05)
+	assert plugin._printer.sent_commands[-1] == "M117 Adjust 2 screws, see OctoPrint"
+
+	plugin.on_api_command("resume", {})
+	sleep(0.01)
+
+	# Single verification pass
+	for point in plugin.get_probe_points():
+		assert plugin._printer.sent_commands[-1] == "G30 X%s Y%s" % point
+		plugin.process_gcode(None, "Bed X: %s.0 Y: %s.0 Z: 0.0" % point)
+		sleep(0.01)
+
+	assert plugin.running is False
+	assert plugin._printer.sent_commands[-1] == "M117 done"
+	assert plugin._plugin_manager.sent_messages[-1] == dict(type="completed")
+	thread.join(1)
+
+
+def test_predictive_screws_from_plane(plugin):
+	plugin._settings.set(["screw_positions"], [dict(x="0", y="0"), dict(x="230", y="0"), dict(x="115", y="230")])
+
+	# Bed rising towards +X only
+	samples = [(x, y, 0.001 * float(x)) for x, y in plugin.get_probe_points()]
+	corrections = plugin._predict_corrections(samples, 0, 0.01)
+
+	assert corrections == [
+		dict(x="230", y="0", mm=0.23, turns=0.46, direction=">>>"),
+		dict(x="115", y="230", mm=0.115, turns=0.23, direction=">>>"),
+	]
+
+
+def test_predictive_abort_while_waiting(plugin):
+	plugin._settings.set(["tramming_mode"], "predictive")
+
+	thread = threading.Thread(target=plugin.autobim)
+	thread.start()
+	sleep(0.01)
+
+	for point in plugin.get_probe_points():
+		plugin.process_gcode(None, "Bed X: %s.0 Y: %s.0 Z: 1.0" % point)
+		sleep(0.01)
+
+	plugin.on_api_command("abort", {})
+	thread.join(1)
+
+	assert not thread.is_alive()
+	assert plugin._plugin_manager.sent_messages[-1]['type'] == "aborted"
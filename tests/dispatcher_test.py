@@ -0,0 +1,101 @@
+import logging
+
+import pytest
+
+from octoprint_autobim.dispatcher import LineDispatcher
+from octoprint_autobim.g30 import G30Handler
+from octoprint_autobim.m503 import M503Handler
+from tests.mocks import MockPrinter, MockSettings
+
+
+class RecordingHandler(G30Handler):
+	def __init__(self, printer, settings):
+		super(RecordingHandler, self).__init__(printer, settings, logging.getLogger("Recording Handler"))
+		self.seen = []
+
+	def _handle_internal(self, line):
+		self.seen.append(line)
+		super(RecordingHandler, self)._handle_internal(line)
+
+
+@pytest.fixture
+def printer():
+	return MockPrinter()
+
+
+@pytest.fixture
+def settings():
+	return MockSettings()
+
+
+@pytest.fixture
+def dispatcher():
+	return LineDispatcher()
+
+
+def test_idle_is_not_armed(dispatcher, printer, settings):
+	dispatcher.register(G30Handler(printer, settings, logging.getLogger("G30 Handler")))
+	dispatcher.register(M503Handler(printer))
+
+	assert dispatcher.armed is False
+
+
+def test_armed_while_running(dispatcher, printer, settings):
+	g30 = G30Handler(printer, settings, logging.getLogger("G30 Handler"))
+	dispatcher.register(g30)
+
+	g30._start((1, 2))
+	assert dispatcher.armed is True
+
+	dispatcher.dispatch("Bed X: 1.0 Y: 2.0 Z: 3.0")
+	assert dispatcher.armed is False
+	assert g30._get(0).value == 3.0
+
+
+def test_only_matching_prefix_is_forwarded(dispatcher, printer, settings):
+	g30 = RecordingHandler(printer, settings)
+	dispatcher.register(g30)
+
+	g30._start((1, 2))
+	for line in ["T:210.00 /210.00 B:60.00 /60.00 @:127 B@:0", "echo:busy: processing", "X:1.00 Y:2.00 Z:3.00"]:
+		dispatcher.dispatch(line)
+	assert g30.seen == []
+
+	dispatcher.dispatch("Bed X: 1.0 Y: 2.0 Z: 3.0")
+	assert g30.seen == ["Bed X: 1.0 Y: 2.0 Z: 3.0"]
+
+
+def test_klipper_prefixes(dispatcher, printer, settings):
+	printer.firmware_info = {"name": "Klipper"}
+	g30 = RecordingHandler(printer, settings)
+	dispatcher.register(g30)
+
+	g30._start((1, 2))
+	dispatcher.dispatch("Bed X: 1.0 Y: 2.0 Z: 3.0")
+	dispatcher.dispatch("// Result is z=0.25")
+
+	assert g30.seen == ["// Result is z=0.25"]
+	assert g30._get(0).value == 0.25
+
+
+def test_custom_pattern_sees_all_lines(dispatcher, printer, settings):
+	settings.set(["g30_regex"], r"^probe z=(-?\d+\.\d+)$")
+	g30 = RecordingHandler(printer, settings)
+	dispatcher.register(g30)
+
+	g30._start((1, 2))
+	dispatcher.dispatch("echo:busy: processing")
+	dispatcher.dispatch("probe z=1.5")
+
+	assert g30.seen == ["echo:busy: processing", "probe z=1.5"]
+	assert g30._get(0).value == 1.5
+
+
+def test_m503_ubl(dispatcher, printer):
+	m503 = M503Handler(printer)
+	dispatcher.register(m503)
+
+	m503._start()
+	dispatcher.dispatch("Unified Bed Leveling System v1.01")
+
+	assert m503._get(0).value is True
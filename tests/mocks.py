@@ -1,8 +1,19 @@
 import logging
+from collections import OrderedDict
 
 from octoprint_autobim.autobim import AutobimPlugin
 
 
+class MockComm(object):
+	def __init__(self):
+		self._received_message_hooks = OrderedDict()
+
+	def receive(self, line):
+		for name, hook in self._received_message_hooks.items():
+			line = hook(self, line)
+		return line
+
+
 class MockPrinter(object):
 	def __init__(self):
 		self._logger = logging.getLogger("MockPrinter")
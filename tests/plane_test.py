@@ -0,0 +1,32 @@
+import pytest
+
+from octoprint_autobim.plane import fit_plane
+
+
+def test_exact_plane():
+	samples = [(x, y, 0.001 * x - 0.002 * y + 0.5) for x, y in [(30, 30), (30, 200), (200, 200), (200, 30)]]
+
+	plane = fit_plane(samples)
+
+	assert plane.a == pytest.approx(0.001)
+	assert plane.b == pytest.approx(-0.002)
+	assert plane.c == pytest.approx(0.5)
+	assert plane.z_at("115", "115") == pytest.approx(0.385)
+
+
+def test_least_squares():
+	# One corner off - the fit splits the difference
+	plane = fit_plane([(0, 0, 0.0), (0, 10, 0.0), (10, 10, 0.0), (10, 0, 0.4)])
+
+	assert plane.z_at(10, 0) == pytest.approx(0.3)
+	assert plane.z_at(0, 10) == pytest.approx(-0.1)
+
+
+def test_too_few_points():
+	with pytest.raises(ValueError):
+		fit_plane([(0, 0, 0), (1, 1, 1)])
+
+
+def test_collinear():
+	with pytest.raises(ValueError):
+		fit_plane([(0, 0, 0), (1, 1, 1), (2, 2, 2)])
@@ -0,0 +1,57 @@
+import logging
+
+import pytest
+
+from octoprint_autobim.received_hook import ReceivedHook
+from tests.mocks import MockComm, MockPrinter
+
+
+@pytest.fixture
+def printer():
+	printer = MockPrinter()
+	printer._comm = MockComm()
+	return printer
+
+
+@pytest.fixture
+def hook(printer):
+	return ReceivedHook(printer, "autobim", lambda comm, line: line, logging.getLogger("Received Hook"))
+
+
+def test_attach_detach(hook, printer):
+	assert "autobim" not in printer._comm._received_message_hooks
+
+	with hook:
+		assert hook.is_attached()
+		assert "autobim" in printer._comm._received_message_hooks
+
+	assert not hook.is_attached()
+	assert "autobim" not in printer._comm._received_message_hooks
+
+
+def test_nested_sessions(hook, printer):
+	with hook:
+		with hook:
+			assert "autobim" in printer._comm._received_message_hooks
+		assert "autobim" in printer._comm._received_message_hooks
+	assert "autobim" not in printer._comm._received_message_hooks
+
+
+def test_keeps_other_hooks(hook, printer):
+	other = lambda comm, line: line
+	printer._comm._received_message_hooks["other"] = other
+
+	with hook:
+		assert list(printer._comm._received_message_hooks.keys()) == ["other", "autobim"]
+
+	assert list(printer._comm._received_message_hooks.items()) == [("other", other)]
+
+
+def test_not_connected(hook, printer):
+	printer._comm = None
+
+	with hook:
+		assert not hook.is_attached()
+
+	hook.detach()
+	assert not hook.is_attached()
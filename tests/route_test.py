@@ -0,0 +1,40 @@
+from octoprint_autobim.route import _two_opt, optimize_route, route_length
+
+
+def test_empty():
+	assert optimize_route([]) == []
+
+
+def test_single():
+	assert optimize_route([("30", "30")]) == [("30", "30")]
+
+
+def test_starts_closest_to_start():
+	points = [("200", "200"), ("30", "30"), ("200", "30"), ("30", "200")]
+
+	assert optimize_route(points)[0] == ("30", "30")
+	assert optimize_route(points, start=(235, 0))[0] == ("200", "30")
+	assert route_length(optimize_route(points)) == route_length([("30", "30"), ("30", "200"), ("200", "200"), ("200", "30")])
+
+
+def test_never_longer_than_input_order():
+	points = [(0, 0), (100, 100), (0, 100), (100, 0), (50, 50), (50, 0), (0, 50), (100, 50), (50, 100)]
+
+	optimized = optimize_route(points)
+
+	assert sorted(optimized) == sorted(points)
+	assert route_length(optimized) < route_length(points)
+
+
+def test_two_opt_removes_crossing():
+	coords = [(0.0, 10.0), (10.0, 0.0), (10.0, 10.0)]
+
+	order = _two_opt((0.0, 0.0), coords, [0, 1, 2])
+
+	assert route_length([coords[i] for i in order]) == 30.0
+
+
+def test_coordinates_accessor():
+	points = [{'x': "200", 'y': "30"}, {'x': "30", 'y': "30"}]
+
+	assert optimize_route(points, coordinates=lambda p: (p['x'], p['y'])) == [{'x': "30", 'y': "30"}, {'x': "200", 'y': "30"}]